@@ -1,23 +1,65 @@
 from django.contrib import admin
 from .models import Listing, Booking, Review, Payment
+from .tasks import dispatch_booking_confirmation_emails
+
+
+class ChangelistDeferMixin:
+    """
+    Defer changelist_defer_fields on the changelist page, where list_display
+    never renders them. Change forms still load every column.
+    """
+    changelist_defer_fields = []
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        changelist_url_name = f'{self.opts.app_label}_{self.opts.model_name}_changelist'
+        if request.resolver_match and request.resolver_match.url_name == changelist_url_name:
+            queryset = queryset.defer(*self.changelist_defer_fields)
+        return queryset
 
 
 @admin.register(Listing)
-class ListingAdmin(admin.ModelAdmin):
+class ListingAdmin(ChangelistDeferMixin, admin.ModelAdmin):
     list_display = ['title', 'host', 'city', 'country', 'property_type', 'price_per_night', 'is_active', 'created_at']
     list_filter = ['property_type', 'is_active', 'city', 'country', 'created_at']
     search_fields = ['title', 'description', 'address', 'city', 'country']
     readonly_fields = ['created_at', 'updated_at']
-    raw_id_fields = ['host']
+    autocomplete_fields = ['host']
+    list_select_related = ['host']
+    changelist_defer_fields = ['description', 'amenities']
 
 
 @admin.register(Booking)
-class BookingAdmin(admin.ModelAdmin):
+class BookingAdmin(ChangelistDeferMixin, admin.ModelAdmin):
     list_display = ['id', 'listing', 'guest', 'check_in_date', 'check_out_date', 'status', 'total_price', 'created_at']
     list_filter = ['status', 'check_in_date', 'check_out_date', 'created_at']
     search_fields = ['listing__title', 'guest__username', 'guest__email']
     readonly_fields = ['created_at', 'updated_at']
-    raw_id_fields = ['listing', 'guest']
+    autocomplete_fields = ['listing', 'guest']
+    list_select_related = ['listing', 'guest']
+    changelist_defer_fields = ['special_requests', 'listing__description', 'listing__amenities']
+    actions = ['send_confirmation_emails']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('listing', 'guest')
+
+    @admin.action(description='Send confirmation emails to selected guests')
+    def send_confirmation_emails(self, request, queryset):
+        # The email tells guests their reservation is confirmed, so other
+        # statuses and guests without an address get nothing
+        selected = queryset.count()
+        confirmed = queryset.filter(status='confirmed')
+        without_email = confirmed.filter(guest__email='').count()
+        booking_ids = list(confirmed.exclude(guest__email='').values_list('id', flat=True))
+        dispatch_booking_confirmation_emails(booking_ids)
+
+        not_confirmed = selected - len(booking_ids) - without_email
+        self.message_user(
+            request,
+            f'Queued confirmation emails for {len(booking_ids)} confirmed bookings. '
+            f'Skipped {not_confirmed} bookings that are not confirmed and '
+            f'{without_email} whose guest has no email address.'
+        )
 
 
 @admin.register(Review)
@@ -26,7 +68,11 @@ class ReviewAdmin(admin.ModelAdmin):
     list_filter = ['rating', 'created_at']
     search_fields = ['listing__title', 'reviewer__username', 'comment']
     readonly_fields = ['created_at', 'updated_at']
-    raw_id_fields = ['listing', 'reviewer']
+    autocomplete_fields = ['listing', 'reviewer']
+    list_select_related = ['listing', 'reviewer']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('listing', 'reviewer')
 
 
 @admin.register(Payment)
@@ -35,5 +81,10 @@ class PaymentAdmin(admin.ModelAdmin):
     list_filter = ['status', 'created_at']
     search_fields = ['payment_reference', 'transaction_id', 'booking__guest__username', 'booking__guest__email']
     readonly_fields = ['payment_reference', 'created_at', 'updated_at']
-    raw_id_fields = ['booking']
+    autocomplete_fields = ['booking']
+    # Booking.__str__ renders both the listing title and the guest username
+    list_select_related = ['booking__listing', 'booking__guest']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('booking__listing', 'booking__guest')
 
@@ -1,9 +1,14 @@
 """
 Chapa API integration service for payment processing.
 """
+import httpx
+import orjson
+import pybreaker
 import requests
 import logging
 from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 logger = logging.getLogger(__name__)
 
@@ -11,6 +16,153 @@ CHAPA_API_BASE_URL = "https://api.chapa.co/v1"
 CHAPA_INITIATE_URL = f"{CHAPA_API_BASE_URL}/transaction/initialize"
 CHAPA_VERIFY_URL = f"{CHAPA_API_BASE_URL}/transaction/verify"
 
+# Fields of the Chapa "data" object worth keeping on the Payment record
+CHAPA_RESPONSE_KEYS = ("tx_ref", "checkout_url", "status", "amount", "currency", "reference")
+
+CHAPA_SECRET_KEY = getattr(settings, 'CHAPA_SECRET_KEY', '')
+CHAPA_AUTH_HEADERS = {"Authorization": f"Bearer {CHAPA_SECRET_KEY}"}
+
+# (connect, read) timeouts in seconds
+CHAPA_TIMEOUT = (3, 10)
+
+# Shared session so consecutive calls reuse pooled keep-alive TLS connections.
+# The pool is sized for threaded/gevent workers making concurrent calls.
+# Only idempotent GETs (verification) are retried on gateway errors; failed
+# connects are retried for every method since nothing reached Chapa.
+_session = requests.Session()
+_session.headers.update({"Content-Type": "application/json"})
+_session.mount("https://", HTTPAdapter(
+    pool_connections=20,
+    pool_maxsize=100,
+    max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[502, 503, 504], allowed_methods=["GET"]),
+))
+
+# Async counterpart for async views and workers; must be used from one event loop
+_async_client = httpx.AsyncClient(
+    base_url=CHAPA_API_BASE_URL,
+    headers={"Content-Type": "application/json"},
+    timeout=httpx.Timeout(CHAPA_TIMEOUT[1], connect=CHAPA_TIMEOUT[0]),
+    http2=True,
+)
+
+
+def _is_client_error(exc):
+    """
+    4xx responses mean the request was bad, not that Chapa is down.
+    """
+    return isinstance(exc, requests.HTTPError) and exc.response is not None and exc.response.status_code < 500
+
+
+# Fail fast once Chapa keeps failing instead of tying up workers on timeouts
+_breaker = pybreaker.CircuitBreaker(fail_max=5, reset_timeout=30, exclude=[_is_client_error])
+
+
+def _chapa_request(method, url, **kwargs):
+    """
+    Send a request to Chapa through the shared session, raising on HTTP errors.
+    """
+    response = _session.request(method, url, headers=CHAPA_AUTH_HEADERS, timeout=CHAPA_TIMEOUT, **kwargs)
+    response.raise_for_status()
+    return response
+
+
+def _build_initiate_payload(amount, email, first_name, last_name, phone, currency, tx_ref, callback_url, return_url, **kwargs):
+    """
+    Build the request body for a Chapa transaction initialization.
+    """
+    if not tx_ref:
+        import uuid
+        tx_ref = f"TX-{uuid.uuid4().hex[:12].upper()}"
+    
+    payload = {
+        "amount": str(float(amount)),
+        "currency": currency,
+        "email": email,
+        "first_name": first_name,
+        "last_name": last_name,
+        "phone_number": phone,
+        "tx_ref": tx_ref,
+        **kwargs
+    }
+    
+    if callback_url:
+        payload["callback_url"] = callback_url
+    
+    if return_url:
+        payload["return_url"] = return_url
+    
+    return payload
+
+
+def _summarize_response(data):
+    """
+    Keep only the CHAPA_RESPONSE_KEYS subset of a decoded Chapa response.
+    """
+    transaction_data = data.get("data")
+    if not isinstance(transaction_data, dict):
+        return {}
+    return {key: transaction_data[key] for key in CHAPA_RESPONSE_KEYS if key in transaction_data}
+
+
+def _parse_initiate_response(data):
+    """
+    Convert a decoded Chapa initialization response into our result dict.
+    """
+    if data.get("status") == "success" and "data" in data:
+        transaction_data = data["data"]
+        return {
+            "transaction_id": transaction_data.get("tx_ref"),
+            "checkout_url": transaction_data.get("checkout_url"),
+            "status": "success",
+            "message": data.get("message", "Payment initiated successfully"),
+            "response_data": _summarize_response(data)
+        }
+    
+    logger.error(f"Chapa API error: {data.get('message', 'Unknown error')}")
+    return {
+        "status": "error",
+        "message": data.get("message", "Failed to initiate payment"),
+        "response_data": _summarize_response(data)
+    }
+
+
+def _parse_verify_response(data):
+    """
+    Convert a decoded Chapa verification response into our result dict.
+    """
+    if data.get("status") == "success" and "data" in data:
+        transaction_data = data["data"]
+        payment_status = transaction_data.get("status", "").lower()
+        
+        return {
+            "status": "success",
+            "payment_status": payment_status,
+            "transaction_id": transaction_data.get("tx_ref"),
+            "amount": transaction_data.get("amount"),
+            "currency": transaction_data.get("currency"),
+            "email": transaction_data.get("email"),
+            "message": data.get("message", "Payment verified successfully"),
+            "response_data": _summarize_response(data)
+        }
+    
+    logger.error(f"Chapa verification error: {data.get('message', 'Unknown error')}")
+    return {
+        "status": "error",
+        "message": data.get("message", "Failed to verify payment"),
+        "response_data": _summarize_response(data)
+    }
+
+
+def _error_response(message):
+    """
+    Build the result dict returned when the Chapa call itself fails.
+    """
+    return {
+        "status": "error",
+        "message": message,
+        "response_data": None
+    }
+
 
 def initiate_payment(amount, email, first_name, last_name, phone, currency="ETB", tx_ref=None, callback_url=None, return_url=None, **kwargs):
     """
@@ -31,75 +183,55 @@ def initiate_payment(amount, email, first_name, last_name, phone, currency="ETB"
     Returns:
         dict: Response containing transaction_id and checkout_url, or None if failed
     """
-    secret_key = getattr(settings, 'CHAPA_SECRET_KEY', '')
-    
-    if not secret_key:
+    if not CHAPA_SECRET_KEY:
         logger.error("CHAPA_SECRET_KEY is not configured in settings")
         return None
     
-    if not tx_ref:
-        import uuid
-        tx_ref = f"TX-{uuid.uuid4().hex[:12].upper()}"
+    payload = _build_initiate_payload(
+        amount, email, first_name, last_name, phone, currency, tx_ref, callback_url, return_url, **kwargs
+    )
     
-    headers = {
-        "Authorization": f"Bearer {secret_key}",
-        "Content-Type": "application/json"
-    }
+    try:
+        response = _breaker.call(_chapa_request, "POST", CHAPA_INITIATE_URL, data=orjson.dumps(payload))
+        return _parse_initiate_response(orjson.loads(response.content))
     
-    payload = {
-        "amount": str(float(amount)),
-        "currency": currency,
-        "email": email,
-        "first_name": first_name,
-        "last_name": last_name,
-        "phone_number": phone,
-        "tx_ref": tx_ref,
-        **kwargs
-    }
+    except pybreaker.CircuitBreakerError:
+        logger.error("Chapa circuit breaker is open; skipping payment initiation")
+        return _error_response("Payment provider is temporarily unavailable")
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Error calling Chapa API: {str(e)}")
+        return _error_response(f"Network error: {str(e)}")
+    except Exception as e:
+        logger.error(f"Unexpected error in initiate_payment: {str(e)}")
+        return _error_response(f"Unexpected error: {str(e)}")
+
+
+async def initiate_payment_async(amount, email, first_name, last_name, phone, currency="ETB", tx_ref=None, callback_url=None, return_url=None, **kwargs):
+    """
+    Async variant of initiate_payment that does not block the calling worker
+    while waiting on Chapa. Takes the same arguments and returns the same dict.
+    """
+    if not CHAPA_SECRET_KEY:
+        logger.error("CHAPA_SECRET_KEY is not configured in settings")
+        return None
     
-    if callback_url:
-        payload["callback_url"] = callback_url
-    
-    if return_url:
-        payload["return_url"] = return_url
+    payload = _build_initiate_payload(
+        amount, email, first_name, last_name, phone, currency, tx_ref, callback_url, return_url, **kwargs
+    )
     
     try:
-        response = requests.post(CHAPA_INITIATE_URL, json=payload, headers=headers, timeout=30)
+        response = await _async_client.post(
+            "/transaction/initialize", content=orjson.dumps(payload), headers=CHAPA_AUTH_HEADERS
+        )
         response.raise_for_status()
-        
-        data = response.json()
-        
-        if data.get("status") == "success" and "data" in data:
-            transaction_data = data["data"]
-            return {
-                "transaction_id": transaction_data.get("tx_ref"),
-                "checkout_url": transaction_data.get("checkout_url"),
-                "status": "success",
-                "message": data.get("message", "Payment initiated successfully"),
-                "full_response": data
-            }
-        else:
-            logger.error(f"Chapa API error: {data.get('message', 'Unknown error')}")
-            return {
-                "status": "error",
-                "message": data.get("message", "Failed to initiate payment"),
-                "full_response": data
-            }
+        return _parse_initiate_response(orjson.loads(response.content))
     
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"Error calling Chapa API: {str(e)}")
-        return {
-            "status": "error",
-            "message": f"Network error: {str(e)}",
-            "full_response": None
-        }
+        return _error_response(f"Network error: {str(e)}")
     except Exception as e:
-        logger.error(f"Unexpected error in initiate_payment: {str(e)}")
-        return {
-            "status": "error",
-            "message": f"Unexpected error: {str(e)}",
-            "full_response": None
-        }
+        logger.error(f"Unexpected error in initiate_payment_async: {str(e)}")
+        return _error_response(f"Unexpected error: {str(e)}")
 
 
 def verify_payment(transaction_id):
@@ -112,58 +244,46 @@ def verify_payment(transaction_id):
     Returns:
         dict: Response containing payment status and details, or None if failed
     """
-    secret_key = getattr(settings, 'CHAPA_SECRET_KEY', '')
-    
-    if not secret_key:
+    if not CHAPA_SECRET_KEY:
         logger.error("CHAPA_SECRET_KEY is not configured in settings")
         return None
     
-    headers = {
-        "Authorization": f"Bearer {secret_key}",
-        "Content-Type": "application/json"
-    }
-    
     verify_url = f"{CHAPA_VERIFY_URL}/{transaction_id}"
     
     try:
-        response = requests.get(verify_url, headers=headers, timeout=30)
-        response.raise_for_status()
-        
-        data = response.json()
-        
-        if data.get("status") == "success" and "data" in data:
-            transaction_data = data["data"]
-            payment_status = transaction_data.get("status", "").lower()
-            
-            return {
-                "status": "success",
-                "payment_status": payment_status,
-                "transaction_id": transaction_data.get("tx_ref"),
-                "amount": transaction_data.get("amount"),
-                "currency": transaction_data.get("currency"),
-                "email": transaction_data.get("email"),
-                "message": data.get("message", "Payment verified successfully"),
-                "full_response": data
-            }
-        else:
-            logger.error(f"Chapa verification error: {data.get('message', 'Unknown error')}")
-            return {
-                "status": "error",
-                "message": data.get("message", "Failed to verify payment"),
-                "full_response": data
-            }
+        response = _breaker.call(_chapa_request, "GET", verify_url)
+        return _parse_verify_response(orjson.loads(response.content))
     
+    except pybreaker.CircuitBreakerError:
+        logger.error("Chapa circuit breaker is open; skipping payment verification")
+        return _error_response("Payment provider is temporarily unavailable")
     except requests.exceptions.RequestException as e:
         logger.error(f"Error calling Chapa verification API: {str(e)}")
-        return {
-            "status": "error",
-            "message": f"Network error: {str(e)}",
-            "full_response": None
-        }
+        return _error_response(f"Network error: {str(e)}")
     except Exception as e:
         logger.error(f"Unexpected error in verify_payment: {str(e)}")
-        return {
-            "status": "error",
-            "message": f"Unexpected error: {str(e)}",
-            "full_response": None
-        }
+        return _error_response(f"Unexpected error: {str(e)}")
+
+
+async def verify_payment_async(transaction_id):
+    """
+    Async variant of verify_payment. Takes the same arguments and returns the
+    same dict.
+    """
+    if not CHAPA_SECRET_KEY:
+        logger.error("CHAPA_SECRET_KEY is not configured in settings")
+        return None
+    
+    try:
+        response = await _async_client.get(
+            f"/transaction/verify/{transaction_id}", headers=CHAPA_AUTH_HEADERS
+        )
+        response.raise_for_status()
+        return _parse_verify_response(orjson.loads(response.content))
+    
+    except httpx.HTTPError as e:
+        logger.error(f"Error calling Chapa verification API: {str(e)}")
+        return _error_response(f"Network error: {str(e)}")
+    except Exception as e:
+        logger.error(f"Unexpected error in verify_payment_async: {str(e)}")
+        return _error_response(f"Unexpected error: {str(e)}")
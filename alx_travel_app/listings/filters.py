@@ -0,0 +1,53 @@
+"""
+Query parameter filters for the listings API endpoints.
+"""
+from django_filters import rest_framework as filters
+from .models import Listing, Booking, Payment
+
+
+class ListingFilter(filters.FilterSet):
+    """
+    Filter listings by location, type, price and active status.
+
+    Only active listings are returned unless is_active is given explicitly.
+    """
+    city = filters.CharFilter(lookup_expr='icontains')
+    country = filters.CharFilter(lookup_expr='icontains')
+    max_price = filters.NumberFilter(field_name='price_per_night', lookup_expr='lte')
+    is_active = filters.BooleanFilter()
+
+    class Meta:
+        model = Listing
+        fields = ['city', 'country', 'property_type', 'max_price', 'is_active']
+
+    def __init__(self, data=None, *args, **kwargs):
+        if data is not None:
+            data = data.copy()
+            data.setdefault('is_active', 'true')
+        super().__init__(data, *args, **kwargs)
+
+
+class BookingFilter(filters.FilterSet):
+    """
+    Filter bookings by guest, listing, status and stay dates.
+    """
+    # Plain ID filters, so a request doesn't look up the related row first
+    guest = filters.NumberFilter(field_name='guest')
+    listing = filters.NumberFilter(field_name='listing')
+    check_in_after = filters.DateFilter(field_name='check_in_date', lookup_expr='gte')
+    check_out_before = filters.DateFilter(field_name='check_out_date', lookup_expr='lte')
+
+    class Meta:
+        model = Booking
+        fields = ['guest', 'listing', 'status', 'check_in_after', 'check_out_before']
+
+
+class PaymentFilter(filters.FilterSet):
+    """
+    Filter payments by booking, status and Chapa transaction ID.
+    """
+    booking = filters.NumberFilter(field_name='booking')
+
+    class Meta:
+        model = Payment
+        fields = ['booking', 'status', 'transaction_id']
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-15 11:37
+
+import alx_travel_app.listings.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0002_payment_booking_booking_status_check_in_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='payment',
+            name='payment_reference',
+            field=models.CharField(default=alx_travel_app.listings.models.generate_payment_reference, help_text='Unique reference for this payment', max_length=255, unique=True),
+        ),
+    ]
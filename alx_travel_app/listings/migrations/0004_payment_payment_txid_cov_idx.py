@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-15 11:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0003_alter_payment_payment_reference'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['transaction_id', 'status', 'amount'], name='payment_txid_cov_idx'),
+        ),
+    ]
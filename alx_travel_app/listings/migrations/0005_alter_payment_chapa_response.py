@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-15 11:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0004_payment_payment_txid_cov_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='payment',
+            name='chapa_response',
+            field=models.JSONField(blank=True, help_text='Relevant fields from the Chapa API response', null=True),
+        ),
+    ]
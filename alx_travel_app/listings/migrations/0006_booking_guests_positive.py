@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-15 11:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0005_alter_payment_chapa_response'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='booking',
+            constraint=models.CheckConstraint(condition=models.Q(('number_of_guests__gte', 1)), name='guests_positive'),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils.functional import cached_property
 import uuid
 
 
@@ -48,10 +49,25 @@ class Listing(models.Model):
         ordering = ['-created_at']
         verbose_name = 'Listing'
         verbose_name_plural = 'Listings'
+        indexes = [
+            models.Index(fields=['is_active', 'city', 'price_per_night'], name='listing_active_city_price_idx'),
+            models.Index(fields=['country', 'property_type'], name='listing_country_type_idx'),
+            models.Index(fields=['property_type'], name='listing_property_type_idx'),
+            models.Index(fields=['-created_at'], name='listing_created_at_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.city}, {self.country}"
 
+    @cached_property
+    def amenities_list(self):
+        """
+        Comma-separated amenities as a list, parsed once per instance.
+        """
+        if self.amenities:
+            return [amenity.strip() for amenity in self.amenities.split(',') if amenity.strip()]
+        return []
+
 
 class Booking(models.Model):
     """
@@ -97,11 +113,23 @@ class Booking(models.Model):
         ordering = ['-created_at']
         verbose_name = 'Booking'
         verbose_name_plural = 'Bookings'
+        indexes = [
+            models.Index(fields=['status', 'check_in_date'], name='booking_status_check_in_idx'),
+            models.Index(
+                fields=['listing', 'check_in_date', 'check_out_date'],
+                name='booking_listing_dates_idx'
+            ),
+            models.Index(fields=['guest', 'status'], name='booking_guest_status_idx'),
+        ]
         constraints = [
             models.CheckConstraint(
-                check=models.Q(check_out_date__gt=models.F('check_in_date')),
+                condition=models.Q(check_out_date__gt=models.F('check_in_date')),
                 name='check_out_after_check_in'
-            )
+            ),
+            models.CheckConstraint(
+                condition=models.Q(number_of_guests__gte=1),
+                name='guests_positive'
+            ),
         ]
 
     def __str__(self):
@@ -111,10 +139,16 @@ class Booking(models.Model):
         from django.core.exceptions import ValidationError
         if self.check_out_date <= self.check_in_date:
             raise ValidationError("Check-out date must be after check-in date.")
-        if self.number_of_guests > self.listing.max_guests:
+        # Forms and serializers have already loaded the listing; otherwise
+        # fetch only max_guests rather than the whole listing row
+        if Booking.listing.is_cached(self):
+            max_guests = self.listing.max_guests
+        else:
+            max_guests = Listing.objects.filter(pk=self.listing_id).values_list('max_guests', flat=True).first()
+        if max_guests is not None and self.number_of_guests > max_guests:
             raise ValidationError(
                 f"Number of guests ({self.number_of_guests}) exceeds maximum "
-                f"guests allowed ({self.listing.max_guests}) for this listing."
+                f"guests allowed ({max_guests}) for this listing."
             )
 
 
@@ -149,6 +183,13 @@ class Review(models.Model):
         return f"Review by {self.reviewer.username} for {self.listing.title} - {self.rating}/5"
 
 
+def generate_payment_reference():
+    """
+    Generate a unique reference for a new payment.
+    """
+    return f"PAY-{uuid.uuid4().hex[:12].upper()}"
+
+
 class Payment(models.Model):
     """
     Model representing a payment for a booking.
@@ -185,12 +226,13 @@ class Payment(models.Model):
     payment_reference = models.CharField(
         max_length=255,
         unique=True,
+        default=generate_payment_reference,
         help_text="Unique reference for this payment"
     )
     chapa_response = models.JSONField(
         null=True,
         blank=True,
-        help_text="Full response from Chapa API"
+        help_text="Relevant fields from the Chapa API response"
     )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -199,12 +241,13 @@ class Payment(models.Model):
         ordering = ['-created_at']
         verbose_name = 'Payment'
         verbose_name_plural = 'Payments'
+        indexes = [
+            models.Index(fields=['status'], name='payment_status_idx'),
+            models.Index(fields=['booking', 'status'], name='payment_booking_status_idx'),
+            # Covers transaction_id lookups that only need status and amount
+            models.Index(fields=['transaction_id', 'status', 'amount'], name='payment_txid_cov_idx'),
+        ]
 
     def __str__(self):
         return f"Payment {self.payment_reference} - {self.status} - {self.amount}"
 
-    def save(self, *args, **kwargs):
-        if not self.payment_reference:
-            self.payment_reference = f"PAY-{uuid.uuid4().hex[:12].upper()}"
-        super().save(*args, **kwargs)
-
@@ -0,0 +1,24 @@
+"""
+Response renderers for the listings API endpoints.
+"""
+import orjson
+from rest_framework.renderers import JSONRenderer
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson instead of the stdlib json module.
+
+    Output matches DRF's compact JSON. Requests asking for an indent
+    (e.g. "Accept: application/json; indent=4") fall back to the stdlib
+    encoder, since orjson only supports two-space indentation.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS)
@@ -1,25 +1,91 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
+from drf_serializer_cache import SerializerCacheMixin
 from .models import Listing, Booking, Payment
 
 
-class UserSerializer(serializers.ModelSerializer):
+def build_amenities_map(listings):
+    """
+    Map listing ids to parsed amenities, splitting each distinct string once.
+
+    Pass the result as the 'amenities_map' serializer context entry when
+    serializing many rows that nest the same listings.
+    """
+    parsed = {}
+    amenities_map = {}
+    for listing in listings:
+        if listing.id in amenities_map:
+            continue
+        if listing.amenities not in parsed:
+            parsed[listing.amenities] = listing.amenities_list
+        amenities_map[listing.id] = parsed[listing.amenities]
+    return amenities_map
+
+
+class EagerLoadingMixin:
+    """
+    Lets a serializer declare the relations its nested fields read, so views
+    can load them together with the main queryset. Read-only serializers may
+    also set only_fields to restrict the columns fetched.
+    """
+    select_related_fields = []
+    prefetch_related_fields = []
+    only_fields = []
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """
+        Apply the serializer's select_related/prefetch_related plan to a queryset.
+        """
+        if cls.only_fields:
+            queryset = queryset.only(*cls.only_fields)
+        if cls.select_related_fields:
+            queryset = queryset.select_related(*cls.select_related_fields)
+        if cls.prefetch_related_fields:
+            queryset = queryset.prefetch_related(*cls.prefetch_related_fields)
+        return queryset
+
+
+class UserSerializer(SerializerCacheMixin, serializers.ModelSerializer):
     """
     Serializer for User model (used in nested relationships).
     """
+    @classmethod
+    def lookup_queryset(cls):
+        """
+        Users loaded with just the columns this serializer renders, for
+        write-only primary key fields whose instances are later nested.
+        """
+        return User.objects.only(*cls.Meta.fields)
+
     class Meta:
         model = User
         fields = ['id', 'username', 'first_name', 'last_name', 'email']
         read_only_fields = ['id']
 
 
-class ListingSerializer(serializers.ModelSerializer):
+class ListingSerializer(SerializerCacheMixin, EagerLoadingMixin, serializers.ModelSerializer):
     """
     Serializer for Listing model.
     """
+    select_related_fields = ['host']
+
+    @classmethod
+    def lookup_queryset(cls):
+        """
+        Listings and their hosts loaded with just the columns this serializer
+        renders, for write-only primary key fields whose instances are later
+        nested.
+        """
+        model_fields = {field.name for field in Listing._meta.concrete_fields}
+        return cls.setup_eager_loading(Listing.objects.all()).only(
+            *(field for field in cls.Meta.fields if field in model_fields),
+            *(f'host__{field}' for field in UserSerializer.Meta.fields),
+        )
+
     host = UserSerializer(read_only=True)
     host_id = serializers.PrimaryKeyRelatedField(
-        queryset=User.objects.all(),
+        queryset=UserSerializer.lookup_queryset(),
         source='host',
         write_only=True
     )
@@ -55,9 +121,10 @@ class ListingSerializer(serializers.ModelSerializer):
         """
         Convert comma-separated amenities string to a list.
         """
-        if obj.amenities:
-            return [amenity.strip() for amenity in obj.amenities.split(',') if amenity.strip()]
-        return []
+        amenities_map = self.context.get('amenities_map')
+        if amenities_map is not None and obj.id in amenities_map:
+            return amenities_map[obj.id]
+        return obj.amenities_list
 
     def validate_price_per_night(self, value):
         """
@@ -76,19 +143,38 @@ class ListingSerializer(serializers.ModelSerializer):
         return value
 
 
-class BookingSerializer(serializers.ModelSerializer):
+class ListingListSerializer(SerializerCacheMixin, EagerLoadingMixin, serializers.ModelSerializer):
+    """
+    Read-only summary of a Listing for list responses.
+    """
+    only_fields = ['id', 'title', 'city', 'country', 'property_type', 'price_per_night', 'host']
+
+    host = serializers.PrimaryKeyRelatedField(read_only=True)
+
+    class Meta:
+        model = Listing
+        fields = ['id', 'title', 'city', 'country', 'property_type', 'price_per_night', 'host']
+        read_only_fields = fields
+
+
+class BookingSerializer(SerializerCacheMixin, EagerLoadingMixin, serializers.ModelSerializer):
     """
     Serializer for Booking model.
     """
+    select_related_fields = [
+        *(f'listing__{field}' for field in ListingSerializer.select_related_fields),
+        'guest',
+    ]
+
     listing = ListingSerializer(read_only=True)
     listing_id = serializers.PrimaryKeyRelatedField(
-        queryset=Listing.objects.filter(is_active=True),
+        queryset=ListingSerializer.lookup_queryset().filter(is_active=True),
         source='listing',
         write_only=True
     )
     guest = UserSerializer(read_only=True)
     guest_id = serializers.PrimaryKeyRelatedField(
-        queryset=User.objects.all(),
+        queryset=UserSerializer.lookup_queryset(),
         source='guest',
         write_only=True
     )
@@ -118,6 +204,10 @@ class BookingSerializer(serializers.ModelSerializer):
         """
         Calculate the number of nights for the booking.
         """
+        # List querysets annotate the stay length in SQL (see views.DURATION_NIGHTS)
+        duration = getattr(obj, 'duration_nights', None)
+        if duration is not None:
+            return duration.days
         if obj.check_in_date and obj.check_out_date:
             return (obj.check_out_date - obj.check_in_date).days
         return None
@@ -164,10 +254,23 @@ class BookingSerializer(serializers.ModelSerializer):
         return value
 
 
-class PaymentSerializer(serializers.ModelSerializer):
+class BookingCreateResponseSerializer(serializers.ModelSerializer):
+    """
+    Minimal booking representation returned from booking creation.
+    """
+
+    class Meta:
+        model = Booking
+        fields = ['id', 'status', 'total_price', 'check_in_date', 'check_out_date']
+        read_only_fields = fields
+
+
+class PaymentSerializer(SerializerCacheMixin, EagerLoadingMixin, serializers.ModelSerializer):
     """
     Serializer for Payment model.
     """
+    select_related_fields = [f'booking__{field}' for field in BookingSerializer.select_related_fields]
+
     booking = BookingSerializer(read_only=True)
     booking_id = serializers.PrimaryKeyRelatedField(
         queryset=Booking.objects.all(),
@@ -2,16 +2,60 @@
 Celery tasks for the listings app.
 """
 from celery import shared_task
-from django.core.mail import send_mail
+from django.core.mail import EmailMessage, get_connection
 from django.conf import settings
+from django.db import transaction
 from django.template.loader import render_to_string
-from .models import Booking
+from .models import Booking, Payment
+from .chapa_service import initiate_payment
 import logging
+import smtplib
 
 logger = logging.getLogger(__name__)
 
+BULK_EMAIL_BATCH_SIZE = 50
 
-@shared_task
+
+def build_booking_confirmation_email(booking):
+    """
+    Build the confirmation EmailMessage for a booking.
+
+    Expects booking.guest, booking.listing and booking.payments to be
+    loaded already so building a batch runs no extra queries.
+    """
+    guest = booking.guest
+    listing = booking.listing
+
+    # Get payment information if available
+    payment = next(iter(booking.payments.all()), None)
+    payment_reference = payment.payment_reference if payment else "N/A"
+
+    # Render email message
+    message = render_to_string('emails/booking_confirmation.txt', {
+        'booking': booking,
+        'guest': guest,
+        'listing': listing,
+        'payment_reference': payment_reference,
+    })
+
+    return EmailMessage(
+        subject=f"Booking Confirmation - {listing.title}",
+        body=message,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[guest.email],
+    )
+
+
+def dispatch_booking_confirmation_emails(booking_ids, batch_size=BULK_EMAIL_BATCH_SIZE):
+    """
+    Queue confirmation emails for many bookings, one bulk task per batch.
+    """
+    booking_ids = list(booking_ids)
+    for start in range(0, len(booking_ids), batch_size):
+        send_booking_confirmation_emails_bulk.delay(booking_ids[start:start + batch_size])
+
+
+@shared_task(acks_late=True, autoretry_for=(smtplib.SMTPException,), retry_backoff=True, max_retries=5)
 def send_booking_confirmation_email(booking_id):
     """
     Send booking confirmation email to the guest.
@@ -20,50 +64,15 @@ def send_booking_confirmation_email(booking_id):
         booking_id: ID of the booking to send confirmation for
     """
     try:
-        booking = Booking.objects.get(id=booking_id)
+        booking = (
+            Booking.objects.select_related('guest', 'listing')
+            .prefetch_related('payments')
+            .get(id=booking_id)
+        )
         guest = booking.guest
-        listing = booking.listing
-        
-        # Get payment information if available
-        payment = booking.payments.first()
-        payment_reference = payment.payment_reference if payment else "N/A"
-        
-        # Prepare email content
-        subject = f"Booking Confirmation - {listing.title}"
-        
-        # Create email message
-        message = f"""
-Dear {guest.get_full_name() or guest.username},
-
-Thank you for your booking! Your reservation has been confirmed.
-
-Booking Details:
------------------
-Booking ID: #{booking.id}
-Payment Reference: {payment_reference}
-Listing: {listing.title}
-Location: {listing.city}, {listing.country}
-Check-in: {booking.check_in_date}
-Check-out: {booking.check_out_date}
-Number of Guests: {booking.number_of_guests}
-Total Price: ${booking.total_price}
-
-Special Requests: {booking.special_requests or 'None'}
-
-We look forward to hosting you!
-
-Best regards,
-ALX Travel App Team
-        """
-        
+
         # Send email
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[guest.email],
-            fail_silently=False,
-        )
+        build_booking_confirmation_email(booking).send(fail_silently=False)
         
         logger.info(f"Confirmation email sent successfully to {guest.email} for booking #{booking.id}")
         return f"Email sent successfully to {guest.email}"
@@ -72,6 +81,105 @@ ALX Travel App Team
         logger.error(f"Booking with id {booking_id} does not exist")
         return f"Booking with id {booking_id} does not exist"
     
+    except smtplib.SMTPException as e:
+        # Re-raised so Celery retries the send with backoff
+        logger.warning(f"SMTP error sending confirmation email for booking #{booking_id}: {str(e)}")
+        raise
+    
     except Exception as e:
         logger.error(f"Failed to send confirmation email for booking #{booking_id}: {str(e)}")
         return f"Failed to send email: {str(e)}"
+
+
+@shared_task(acks_late=True)
+def send_booking_confirmation_emails_bulk(booking_ids):
+    """
+    Send confirmation emails for a batch of bookings over one SMTP connection.
+
+    Not retried automatically: a failure part-way through the batch would
+    resend the messages that already went out.
+
+    Args:
+        booking_ids: IDs of the bookings to send confirmations for
+    """
+    bookings = (
+        Booking.objects.select_related('guest', 'listing')
+        .prefetch_related('payments')
+        .filter(id__in=booking_ids)
+    )
+    messages = [build_booking_confirmation_email(booking) for booking in bookings]
+
+    missing = len(set(booking_ids)) - len(messages)
+    if missing:
+        logger.warning(f"{missing} of {len(set(booking_ids))} bookings no longer exist, skipping them")
+
+    try:
+        with get_connection() as connection:
+            sent = connection.send_messages(messages) or 0
+    except Exception as e:
+        logger.error(f"Failed to send bulk confirmation emails: {str(e)}")
+        return f"Failed to send emails: {str(e)}"
+
+    logger.info(f"Sent {sent} confirmation emails in bulk")
+    return f"{sent} emails sent successfully"
+
+
+def _is_initiated(payment):
+    """
+    True once a payment has left the pending state or received a Chapa transaction ID.
+    """
+    return payment.status != 'pending' or bool(payment.transaction_id)
+
+
+# Transaction initialization is not idempotent, so this task opts out of the
+# global CELERY_TASK_ACKS_LATE: a worker dying mid-call must not redeliver it
+@shared_task(acks_late=False)
+def initiate_chapa_payment(payment_id, customer_ctx):
+    """
+    Initiate a pending payment with Chapa and store the outcome on the Payment.
+
+    The checkout_url ends up in payment.chapa_response, which clients read by
+    polling /api/payments/{id}/. Payments that are no longer pending are left
+    untouched, so a duplicate run can't overwrite a successful initiation.
+
+    Args:
+        payment_id: ID of the pending payment to initiate
+        customer_ctx: dict of initiate_payment keyword arguments (email,
+            first_name, last_name, phone, callback_url, return_url)
+    """
+    try:
+        with transaction.atomic():
+            payment = Payment.objects.select_for_update().get(id=payment_id)
+            already_initiated = _is_initiated(payment)
+    except Payment.DoesNotExist:
+        logger.error(f"Payment with id {payment_id} does not exist")
+        return f"Payment with id {payment_id} does not exist"
+
+    if already_initiated:
+        logger.info(f"Payment {payment.payment_reference} was already initiated, skipping")
+        return f"Payment {payment.payment_reference} is {payment.status}"
+
+    # Called without holding the row lock
+    chapa_response = initiate_payment(
+        amount=float(payment.amount),
+        tx_ref=payment.payment_reference,
+        **customer_ctx
+    )
+
+    with transaction.atomic():
+        payment = Payment.objects.select_for_update().get(id=payment_id)
+        if _is_initiated(payment):
+            logger.info(f"Payment {payment.payment_reference} was initiated concurrently, keeping that result")
+            return f"Payment {payment.payment_reference} is {payment.status}"
+
+        if chapa_response and chapa_response.get('status') == 'success':
+            # Update payment with transaction ID and response
+            payment.transaction_id = chapa_response.get('transaction_id', payment.payment_reference)
+            payment.chapa_response = chapa_response.get('response_data')
+        else:
+            payment.status = 'failed'
+            payment.chapa_response = chapa_response
+        payment.save(update_fields=['transaction_id', 'status', 'chapa_response', 'updated_at'])
+
+    logger.info(f"Payment {payment.payment_reference} initiation finished with status {payment.status}")
+    return f"Payment {payment.payment_reference} is {payment.status}"
@@ -1,15 +1,83 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Q
+from django.core.cache import cache
+from django.db.models import DurationField, ExpressionWrapper, F, Q
 from django.db import transaction
 from .models import Listing, Booking, Payment
-from .serializers import ListingSerializer, BookingSerializer, PaymentSerializer
+from .filters import ListingFilter, BookingFilter, PaymentFilter
+from .serializers import (
+    ListingSerializer, ListingListSerializer, BookingSerializer, BookingCreateResponseSerializer, PaymentSerializer,
+    build_amenities_map,
+)
 from .chapa_service import initiate_payment, verify_payment
+from .tasks import initiate_chapa_payment, send_booking_confirmation_email
+from operator import attrgetter
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Stay length computed by the database for booking list responses
+DURATION_NIGHTS = ExpressionWrapper(F('check_out_date') - F('check_in_date'), output_field=DurationField())
+
+# Seconds a listing detail response is served from the cache
+LISTING_CACHE_TIMEOUT = 60
+
+
+def listing_cache_key(pk):
+    """
+    Cache key for a listing's detail response. Bump the version suffix when
+    the ListingSerializer output changes shape.
+    """
+    return f'listing:{pk}:v1'
+
+
+def queue_confirmation_email(booking_id):
+    """
+    Queue the booking confirmation email without failing the request
+    when the broker is unreachable.
+    """
+    try:
+        send_booking_confirmation_email.delay(booking_id)
+    except Exception as e:
+        logger.error(f"Failed to trigger email task: {str(e)}")
+
+
+def queue_payment_initiation(payment_id, customer_ctx):
+    """
+    Queue Chapa initiation for a pending payment. If the broker is unreachable
+    the payment is marked failed so polling clients don't wait on it forever.
+    """
+    try:
+        initiate_chapa_payment.delay(payment_id, customer_ctx)
+    except Exception as e:
+        logger.error(f"Failed to trigger payment initiation task: {str(e)}")
+        Payment.objects.filter(id=payment_id).update(status='failed')
+
+
+class AmenitiesMapMixin:
+    """
+    List responses whose rows nest a listing parse each listing's amenities
+    once per page instead of once per row.
+
+    amenities_listing_path is the dotted attribute path from a row to its listing.
+    """
+    amenities_listing_path = 'listing'
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        rows = page if page is not None else list(queryset)
+        
+        context = self.get_serializer_context()
+        get_listing = attrgetter(self.amenities_listing_path)
+        context['amenities_map'] = build_amenities_map(get_listing(row) for row in rows)
+        serializer = self.get_serializer(rows, many=True, context=context)
+        
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
+
 
 class ListingViewSet(viewsets.ModelViewSet):
     """
@@ -25,45 +93,71 @@ class ListingViewSet(viewsets.ModelViewSet):
     """
     queryset = Listing.objects.all()
     serializer_class = ListingSerializer
+    filterset_class = ListingFilter
     permission_classes = [permissions.AllowAny]  # Adjust permissions as needed
     
+    def get_serializer_class(self):
+        """
+        Use the compact summary serializer for list responses.
+        """
+        if self.action == 'list':
+            return ListingListSerializer
+        return super().get_serializer_class()
+    
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Serve repeated detail reads from the cache. Requests with query
+        parameters bypass it since they can change the result.
+        """
+        try:
+            # Key on the integer pk so /listings/01/ and /listings/1/ share
+            # the entry that perform_update/perform_destroy clear
+            pk = int(kwargs['pk'])
+        except ValueError:
+            pk = None
+        
+        # A cache hit skips get_object() and with it check_object_permissions,
+        # so only cache while no permission class does object-level checks
+        if request.query_params or pk is None or self.has_object_permission_checks():
+            return super().retrieve(request, *args, **kwargs)
+        
+        cache_key = listing_cache_key(pk)
+        data = cache.get(cache_key)
+        if data is None:
+            data = super().retrieve(request, *args, **kwargs).data
+            cache.set(cache_key, data, LISTING_CACHE_TIMEOUT)
+        return Response(data)
+    
+    def has_object_permission_checks(self):
+        """
+        Whether any permission class overrides has_object_permission.
+        """
+        return any(
+            type(permission).has_object_permission is not permissions.BasePermission.has_object_permission
+            for permission in self.get_permissions()
+        )
+    
+    def perform_update(self, serializer):
+        """
+        Save the listing and drop its cached detail response.
+        """
+        super().perform_update(serializer)
+        cache.delete(listing_cache_key(serializer.instance.pk))
+    
+    def perform_destroy(self, instance):
+        """
+        Delete the listing and drop its cached detail response.
+        """
+        cache_key = listing_cache_key(instance.pk)
+        super().perform_destroy(instance)
+        cache.delete(cache_key)
+    
     def get_queryset(self):
         """
-        Optionally filter listings by query parameters.
+        Listings with the relations their serializer renders; query parameter
+        filtering is handled by ListingFilter.
         """
-        queryset = Listing.objects.all()
-        
-        # Filter by city
-        city = self.request.query_params.get('city', None)
-        if city:
-            queryset = queryset.filter(city__icontains=city)
-        
-        # Filter by country
-        country = self.request.query_params.get('country', None)
-        if country:
-            queryset = queryset.filter(country__icontains=country)
-        
-        # Filter by property type
-        property_type = self.request.query_params.get('property_type', None)
-        if property_type:
-            queryset = queryset.filter(property_type=property_type)
-        
-        # Filter by max price
-        max_price = self.request.query_params.get('max_price', None)
-        if max_price:
-            try:
-                queryset = queryset.filter(price_per_night__lte=float(max_price))
-            except ValueError:
-                pass
-        
-        # Filter by active status (default to active only)
-        is_active = self.request.query_params.get('is_active', 'true')
-        if is_active.lower() == 'true':
-            queryset = queryset.filter(is_active=True)
-        elif is_active.lower() == 'false':
-            queryset = queryset.filter(is_active=False)
-        
-        return queryset
+        return self.get_serializer_class().setup_eager_loading(Listing.objects.all())
     
     @action(detail=True, methods=['get'])
     def bookings(self, request, pk=None):
@@ -72,12 +166,17 @@ class ListingViewSet(viewsets.ModelViewSet):
         GET /api/listings/{id}/bookings/
         """
         listing = self.get_object()
-        bookings = Booking.objects.filter(listing=listing)
-        serializer = BookingSerializer(bookings, many=True)
+        bookings = BookingSerializer.setup_eager_loading(
+            Booking.objects.filter(listing=listing)
+        ).annotate(duration_nights=DURATION_NIGHTS)
+        # Every row nests this listing, so its amenities are parsed once
+        serializer = BookingSerializer(bookings, many=True, context={
+            'amenities_map': build_amenities_map([listing]),
+        })
         return Response(serializer.data)
 
 
-class BookingViewSet(viewsets.ModelViewSet):
+class BookingViewSet(AmenitiesMapMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing bookings.
     
@@ -91,38 +190,20 @@ class BookingViewSet(viewsets.ModelViewSet):
     """
     queryset = Booking.objects.all()
     serializer_class = BookingSerializer
+    filterset_class = BookingFilter
     permission_classes = [permissions.AllowAny]  # Adjust permissions as needed
     
     def get_queryset(self):
         """
-        Optionally filter bookings by query parameters.
+        Bookings with the relations their serializer renders; query parameter
+        filtering is handled by BookingFilter.
         """
-        queryset = Booking.objects.all()
-        
-        # Filter by guest
-        guest_id = self.request.query_params.get('guest', None)
-        if guest_id:
-            queryset = queryset.filter(guest_id=guest_id)
-        
-        # Filter by listing
-        listing_id = self.request.query_params.get('listing', None)
-        if listing_id:
-            queryset = queryset.filter(listing_id=listing_id)
+        queryset = self.get_serializer_class().setup_eager_loading(Booking.objects.all())
         
-        # Filter by status
-        status = self.request.query_params.get('status', None)
-        if status:
-            queryset = queryset.filter(status=status)
-        
-        # Filter by check-in date (after)
-        check_in_after = self.request.query_params.get('check_in_after', None)
-        if check_in_after:
-            queryset = queryset.filter(check_in_date__gte=check_in_after)
-        
-        # Filter by check-out date (before)
-        check_out_before = self.request.query_params.get('check_out_before', None)
-        if check_out_before:
-            queryset = queryset.filter(check_out_date__lte=check_out_before)
+        # Only list responses use the annotation; detail and write responses
+        # compute it from the (possibly just updated) instance instead
+        if self.action == 'list':
+            queryset = queryset.annotate(duration_nights=DURATION_NIGHTS)
         
         return queryset
     
@@ -133,88 +214,66 @@ class BookingViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
-        # Create booking with pending status
-        booking = serializer.save(status='pending')
-        
-        # Trigger email notification task asynchronously
-        try:
-            from .tasks import send_booking_confirmation_email
-            send_booking_confirmation_email.delay(booking.id)
-        except Exception as e:
-            logger.error(f"Failed to trigger email task: {str(e)}")
-        
         # Get customer information
-        guest = booking.guest
+        guest = serializer.validated_data['guest']
         email = guest.email or request.data.get('email', '')
         first_name = guest.first_name or request.data.get('first_name', 'Guest')
         last_name = guest.last_name or request.data.get('last_name', 'User')
         phone = request.data.get('phone', '')
         
-        if not email:
+        # Booking and payment rows commit together; Chapa is called from a
+        # worker once they are committed
+        with transaction.atomic():
+            # Create booking with pending status
+            booking = serializer.save(status='pending')
+            
+            # Create payment record
+            payment = None
+            if email:
+                payment = Payment.objects.create(
+                    booking=booking,
+                    amount=booking.total_price,
+                    status='pending'
+                )
+            
+            # Trigger email notification task once the booking is visible to workers
+            transaction.on_commit(lambda: queue_confirmation_email(booking.id))
+            
+            if payment is not None:
+                customer_ctx = {
+                    'email': email,
+                    'first_name': first_name,
+                    'last_name': last_name,
+                    'phone': phone,
+                    'callback_url': request.build_absolute_uri(f'/api/payments/{payment.id}/verify/'),
+                    'return_url': request.data.get('return_url', ''),
+                }
+                transaction.on_commit(lambda: queue_payment_initiation(payment.id, customer_ctx))
+        
+        # Clients only need the booking's identity and totals here; the full
+        # nested representation is available from /api/bookings/{id}/
+        response_serializer = BookingCreateResponseSerializer(booking)
+        
+        if payment is None:
             # Return booking without payment initiation if no email
-            response_serializer = self.get_serializer(booking)
             return Response({
                 **response_serializer.data,
                 'message': 'Booking created. Please provide email to initiate payment.'
             }, status=status.HTTP_201_CREATED)
         
-        # Create payment record
-        from .models import Payment
-        payment = Payment.objects.create(
-            booking=booking,
-            amount=booking.total_price,
-            status='pending'
-        )
-        
-        # Initiate payment with Chapa
-        chapa_response = initiate_payment(
-            amount=float(booking.total_price),
-            email=email,
-            first_name=first_name,
-            last_name=last_name,
-            phone=phone,
-            tx_ref=payment.payment_reference,
-            callback_url=request.build_absolute_uri(f'/api/payments/{payment.id}/verify/'),
-            return_url=request.data.get('return_url', '')
-        )
-        
-        if chapa_response and chapa_response.get('status') == 'success':
-            # Update payment with transaction ID and response
-            payment.transaction_id = chapa_response.get('transaction_id', payment.payment_reference)
-            payment.chapa_response = chapa_response.get('full_response')
-            payment.save()
-            
-            response_serializer = self.get_serializer(booking)
-            return Response({
-                **response_serializer.data,
-                'payment': {
-                    'id': payment.id,
-                    'payment_reference': payment.payment_reference,
-                    'status': payment.status,
-                    'checkout_url': chapa_response.get('checkout_url')
-                },
-                'message': 'Booking created. Use the checkout_url to complete payment.'
-            }, status=status.HTTP_201_CREATED)
-        else:
-            # Payment initiation failed, but booking is created
-            payment.status = 'failed'
-            payment.chapa_response = chapa_response
-            payment.save()
-            
-            response_serializer = self.get_serializer(booking)
-            return Response({
-                **response_serializer.data,
-                'payment': {
-                    'id': payment.id,
-                    'payment_reference': payment.payment_reference,
-                    'status': payment.status,
-                    'error': chapa_response.get('message', 'Failed to initiate payment') if chapa_response else 'Failed to initiate payment'
-                },
-                'message': 'Booking created but payment initiation failed. Please try again.'
-            }, status=status.HTTP_201_CREATED)
+        return Response({
+            **response_serializer.data,
+            'payment': {
+                'id': payment.id,
+                'payment_reference': payment.payment_reference,
+                'status': payment.status,
+                'status_url': request.build_absolute_uri(f'/api/payments/{payment.id}/')
+            },
+            'message': 'Booking created. Payment is being initiated; poll status_url for the checkout_url.'
+        }, status=status.HTTP_202_ACCEPTED)
 
 
-class PaymentViewSet(viewsets.ModelViewSet):
+class PaymentViewSet(AmenitiesMapMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing payments.
     
@@ -226,30 +285,16 @@ class PaymentViewSet(viewsets.ModelViewSet):
     """
     queryset = Payment.objects.all()
     serializer_class = PaymentSerializer
+    filterset_class = PaymentFilter
+    amenities_listing_path = 'booking.listing'
     permission_classes = [permissions.AllowAny]  # Adjust permissions as needed
     
     def get_queryset(self):
         """
-        Optionally filter payments by query parameters.
+        Payments with the relations their serializer renders; query parameter
+        filtering is handled by PaymentFilter.
         """
-        queryset = Payment.objects.all()
-        
-        # Filter by booking
-        booking_id = self.request.query_params.get('booking', None)
-        if booking_id:
-            queryset = queryset.filter(booking_id=booking_id)
-        
-        # Filter by status
-        payment_status = self.request.query_params.get('status', None)
-        if payment_status:
-            queryset = queryset.filter(status=payment_status)
-        
-        # Filter by transaction_id
-        transaction_id = self.request.query_params.get('transaction_id', None)
-        if transaction_id:
-            queryset = queryset.filter(transaction_id=transaction_id)
-        
-        return queryset
+        return self.get_serializer_class().setup_eager_loading(Payment.objects.all())
     
     def create(self, request, *args, **kwargs):
         """
@@ -295,7 +340,7 @@ class PaymentViewSet(viewsets.ModelViewSet):
         if chapa_response and chapa_response.get('status') == 'success':
             # Update payment with transaction ID and response
             payment.transaction_id = chapa_response.get('transaction_id', tx_ref)
-            payment.chapa_response = chapa_response.get('full_response')
+            payment.chapa_response = chapa_response.get('response_data')
             payment.save()
             
             response_serializer = self.get_serializer(payment)
@@ -336,25 +381,24 @@ class PaymentViewSet(viewsets.ModelViewSet):
         if verification_response and verification_response.get('status') == 'success':
             payment_status = verification_response.get('payment_status', '').lower()
             
-            # Update payment status
-            if payment_status == 'success' or payment_status == 'successful':
-                payment.status = 'completed'
-                # Update booking status to confirmed
-                payment.booking.status = 'confirmed'
-                payment.booking.save()
+            # Payment and booking status change together
+            with transaction.atomic():
+                # Update payment status
+                if payment_status == 'success' or payment_status == 'successful':
+                    payment.status = 'completed'
+                    # Update booking status to confirmed
+                    payment.booking.status = 'confirmed'
+                    payment.booking.save()
+                    
+                    # Trigger email confirmation task once the confirmation is committed
+                    booking_id = payment.booking_id
+                    transaction.on_commit(lambda: queue_confirmation_email(booking_id))
                 
-                # Trigger email confirmation task
-                try:
-                    from .tasks import send_booking_confirmation_email
-                    send_booking_confirmation_email.delay(payment.booking.id)
-                except Exception as e:
-                    logger.error(f"Failed to trigger email task: {str(e)}")
-            
-            elif payment_status == 'failed' or payment_status == 'cancelled':
-                payment.status = 'failed'
-            
-            payment.chapa_response = verification_response.get('full_response')
-            payment.save()
+                elif payment_status == 'failed' or payment_status == 'cancelled':
+                    payment.status = 'failed'
+                
+                payment.chapa_response = verification_response.get('response_data')
+                payment.save()
             
             response_serializer = self.get_serializer(payment)
             return Response({
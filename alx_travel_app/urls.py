@@ -4,6 +4,9 @@ from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 from rest_framework import permissions
 
+# Seconds a generated API schema is served from the cache; it only changes on deploy
+SCHEMA_CACHE_TIMEOUT = 60 * 60
+
 schema_view = get_schema_view(
     openapi.Info(
         title="TRAVEL APP API",
@@ -20,6 +23,6 @@ urlpatterns = [
     # API endpoints
     path('api/', include('alx_travel_app.listings.urls')),
     # Swagger docs
-    path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-    path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
+    path('swagger/', schema_view.with_ui('swagger', cache_timeout=SCHEMA_CACHE_TIMEOUT), name='schema-swagger-ui'),
+    path('redoc/', schema_view.with_ui('redoc', cache_timeout=SCHEMA_CACHE_TIMEOUT), name='schema-redoc'),
 ]